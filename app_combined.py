@@ -16,8 +16,9 @@ import time
 import random
 import pickle
 
-from crop_inference import predict_crop_recommendations
+from crop_inference import predict_crop_recommendations, find_similar_districts
 from predict_fertilizer import predict_fertilizer
+from normalization import normalize_state
 
 
 st.set_page_config(
@@ -43,18 +44,6 @@ def load_css(file_name):
 
 load_css(CSS_PATH)
 
-def normalize_state(name):
-    if not isinstance(name, str): return name
-    mapping = {
-        "Andaman And Nicobar Islands": "Andaman And Nicobar",
-        "Dadra And Nagar Haveli": "Dadra & Nagar Haveli",
-        "Daman And Diu": "Daman & Diu",
-        "Jammu And Kashmir": "Jammu & Kashmir",
-        "Delhi": "Nct Of Delhi"
-    }
-    name = name.title().strip()
-    return mapping.get(name, name)
-
 @st.cache_data
 def load_all_data():
     # Load historical
@@ -401,6 +390,23 @@ elif st.session_state.current_page == 4:
     # Map Visualization Mode Toggle
     map_mode = st.radio("Map Mode", ["National Overview", "State Focus"], horizontal=True, label_visibility="collapsed")
     
+    # Similar-district search over historical yield profiles
+    sim_c1, sim_c2, sim_c3 = st.columns([1, 1, 1])
+    show_similar = sim_c1.checkbox("Highlight similar districts", value=True)
+    sim_k = sim_c2.slider("Matches", 3, 15, 5, disabled=not show_similar)
+    sim_metric = sim_c3.radio("Similarity", ["Cosine", "Euclidean"], horizontal=True, disabled=not show_similar)
+    
+    similar_df = None
+    if show_similar and st.session_state.selected_district:
+        try:
+            similar_df, _, _ = find_similar_districts(st.session_state.selected_state, st.session_state.selected_district, k=sim_k, metric=sim_metric.lower())
+            if isinstance(similar_df, str):
+                st.warning(similar_df)
+                similar_df = None
+        except Exception as e:
+            st.error(f"Error running similarity search: {e}")
+            similar_df = None
+    
     # Get center for initial view
     center_lat, center_lon = get_district_center(st.session_state.selected_state, st.session_state.selected_district)
     
@@ -460,6 +466,7 @@ elif st.session_state.current_page == 4:
                     on=['State', 'District'],
                     how='left'
                 ).fillna(0)
+                merged_map_data['Tooltip'] = "<b>District:</b> " + merged_map_data['District'] + "<br/><b>Average Yield:</b> " + merged_map_data['Avg_Yield'].astype(str) + " kg/ha"
                 
                 layers.append(pdk.Layer(
                     "ColumnLayer",
@@ -474,10 +481,52 @@ elif st.session_state.current_page == 4:
                 ))
             view_lat, view_lon, zoom = center_lat, center_lon, 6.5
             tooltip = {
-                "html": "<b>District:</b> {District}<br/><b>Average Yield:</b> {Avg_Yield} kg/ha",
+                "html": "{Tooltip}",
                 "style": {"backgroundColor": "#0f172a", "color": "white"}
             }
 
+        # Similar districts as highlighted points on top of either mode
+        similar_points = pd.DataFrame()
+        if similar_df is not None and not similar_df.empty:
+            similar_points = similar_df.merge(DISTRICT_COORDS_DF, on=['State', 'District'], how='inner')
+            score_col = 'Similarity' if 'Similarity' in similar_points.columns else 'Distance'
+            similar_points['Tooltip'] = (
+                "<b>Match #" + similar_points['Rank'].astype(str) + ":</b> " + similar_points['District'] + ", " + similar_points['State']
+                + f"<br/><b>{score_col}:</b> " + similar_points[score_col].map('{:.3f}'.format)
+                + "<br/><b>Shared Crops:</b> " + similar_points['Shared_Crops'].astype(str)
+            )
+            layers.append(pdk.Layer(
+                "ScatterplotLayer",
+                data=similar_points,
+                get_position=["Longitude", "Latitude"],
+                get_radius=15000,
+                radius_min_pixels=5,
+                get_fill_color="[255, 196, 0, 220]",
+                stroked=True,
+                get_line_color="[255, 255, 255]",
+                line_width_min_pixels=1,
+                pickable=True,
+            ))
+            tooltip = {"html": "{Tooltip}", "style": {"backgroundColor": "#0f172a", "color": "white"}}
+
+            # Only mark the selected district when it has its own coordinates, not the state fallback
+            own_point = DISTRICT_COORDS_DF[
+                (DISTRICT_COORDS_DF['State'] == norm_state) &
+                (DISTRICT_COORDS_DF['District'] == st.session_state.selected_district)
+            ]
+            if not own_point.empty:
+                layers.append(pdk.Layer(
+                    "ScatterplotLayer",
+                    data=own_point[['District', 'Latitude', 'Longitude']],
+                    get_position=["Longitude", "Latitude"],
+                    get_radius=18000,
+                    radius_min_pixels=7,
+                    get_fill_color="[63, 255, 182, 240]",
+                    stroked=True,
+                    get_line_color="[255, 255, 255]",
+                    line_width_min_pixels=2,
+                ))
+
         view_state = pdk.ViewState(
             latitude=view_lat,
             longitude=view_lon,
@@ -498,6 +547,14 @@ elif st.session_state.current_page == 4:
             else:
                 st.write(f"Points in {st.session_state.selected_state}: {len(merged_map_data) if not state_data.empty else 0}")
     
+    if similar_df is not None and not similar_df.empty:
+        st.markdown(f"<h3 class='section-header'>🧭 Districts That Grow Like {st.session_state.selected_district}</h3>", unsafe_allow_html=True)
+        st.markdown("<p class='section-sub'>Nearest districts by historical yield profile across every crop and season. Matches are highlighted in amber on the map; your district is shown in green when its coordinates are known.</p>", unsafe_allow_html=True)
+        st.dataframe(similar_df, use_container_width=True, hide_index=True)
+        missing = len(similar_df) - len(similar_points)
+        if missing > 0:
+            st.caption(f"{missing} matched district(s) have no coordinates in our map database and are not plotted.")
+    
     st.markdown("---", unsafe_allow_html=True)
     st.markdown("### About AgriRank AI")
     st.write("AgriRank AI is an advanced precision agriculture platform designed to empower Indian farmers with data-driven decision making. By leveraging localized coordinates from `district_coords.csv` and historical data, we provide deep spatial insights that help maximize efficiency and sustainability.")
@@ -0,0 +1,299 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+import numpy as np
+
+from normalization import normalize_state, normalize_name
+
+# Configuration
+def get_asset_path(sub_path):
+    base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    assets_path = os.path.join(base_path, 'assets', sub_path)
+    if os.path.exists(assets_path):
+        return assets_path
+    return os.path.join(base_path, sub_path)
+
+CROP_DATA_PATH = get_asset_path("data/unique_crop_requirements.csv")
+HISTORICAL_DATA_PATH = get_asset_path("data/district_crop_master.csv")
+COORDS_DATA_PATH = get_asset_path("data/district_coords.csv")
+MANIFEST_PATH = get_asset_path("data/build_manifest.json")
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Raw sources ship with different headers (crop_production.csv, the all-India
+# pincode directory, ...). Each canonical column maps to the names we accept.
+YIELD_COLUMNS = {
+    'State': ['State', 'State_Name', 'StateName', 'statename'],
+    'District': ['District', 'District_Name', 'DistrictName', 'Districtname', 'districtname'],
+    'Crop': ['Crop', 'Crop_Name', 'crop'],
+    'season': ['season', 'Season'],
+    'Yield': ['Yield', 'yield'],
+    'Area': ['Area', 'area'],
+    'Production': ['Production', 'production'],
+}
+COORDS_COLUMNS = {
+    'State': ['State', 'State_Name', 'StateName', 'statename'],
+    'District': ['District', 'District_Name', 'DistrictName', 'Districtname', 'districtname'],
+    'Latitude': ['Latitude', 'latitude', 'lat'],
+    'Longitude': ['Longitude', 'longitude', 'lon', 'lng'],
+}
+OPTIONAL_YIELD_COLUMNS = {'Yield', 'Area', 'Production'}
+
+# Rough bounding box of India, used to drop garbage geocodes from raw sources
+LAT_RANGE = (6.0, 38.0)
+LON_RANGE = (68.0, 98.0)
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_atomic(path, writer):
+    # Write next to the target and swap in only once the write succeeded,
+    # so a failed build never leaves a half-written asset behind
+    tmp_path = path + '.tmp'
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def detect_encoding(path, sample_size=64 * 1024):
+    try:
+        import chardet
+    except ImportError:
+        return 'utf-8'
+    with open(path, 'rb') as f:
+        guess = chardet.detect(f.read(sample_size))
+    encoding = guess.get('encoding') or 'utf-8'
+    return 'utf-8' if encoding.lower() == 'ascii' else encoding
+
+def resolve_columns(path, aliases, encoding, optional=()):
+    header = pd.read_csv(path, nrows=0, encoding=encoding).columns
+    header_lookup = {c.strip(): c for c in header}
+    resolved = {}
+    for canonical, candidates in aliases.items():
+        match = next((header_lookup[c] for c in candidates if c in header_lookup), None)
+        if match is not None:
+            resolved[canonical] = match
+        elif canonical not in optional:
+            raise ValueError(f"{os.path.basename(path)}: no column for '{canonical}' (tried {candidates})")
+    return resolved
+
+def stream_csv(path, aliases, chunksize, optional=()):
+    """Yield chunks of a raw CSV renamed to canonical columns, reading only what we need."""
+    encoding = detect_encoding(path)
+    columns = resolve_columns(path, aliases, encoding, optional)
+    reader = pd.read_csv(
+        path,
+        usecols=list(columns.values()),
+        chunksize=chunksize,
+        encoding=encoding,
+        dtype=str,
+        keep_default_na=True,
+    )
+    renames = {raw: canonical for canonical, raw in columns.items()}
+    for chunk in reader:
+        yield chunk.rename(columns=renames)
+
+def accumulate(acc, partial):
+    # Keep only one row per group in memory: re-reduce after every chunk
+    if acc is None:
+        return partial
+    return pd.concat([acc, partial]).groupby(level=list(range(partial.index.nlevels))).sum()
+
+def chunk_yields(chunk):
+    if 'Yield' in chunk.columns:
+        yields = pd.to_numeric(chunk['Yield'], errors='coerce')
+    elif {'Area', 'Production'} <= set(chunk.columns):
+        area = pd.to_numeric(chunk['Area'], errors='coerce')
+        production = pd.to_numeric(chunk['Production'], errors='coerce')
+        yields = production / area.where(area > 0)
+    else:
+        raise ValueError("Yield source needs either a 'Yield' column or both 'Area' and 'Production'")
+    return yields.replace([np.inf, -np.inf], np.nan)
+
+def build_district_crop_master(yield_csv, out_path=HISTORICAL_DATA_PATH, crop_reqs_path=CROP_DATA_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    keys = ['State', 'District', 'Crop', 'season']
+    acc = None
+    rows_in = rows_used = 0
+
+    for chunk in stream_csv(yield_csv, YIELD_COLUMNS, chunksize, optional=OPTIONAL_YIELD_COLUMNS):
+        rows_in += len(chunk)
+        chunk = chunk.dropna(subset=keys)
+        part = pd.DataFrame({
+            # States are only title-cased, not mapped: the model's encoding maps use the raw names
+            'State': normalize_name(chunk['State']),
+            'District': normalize_name(chunk['District']),
+            'Crop': normalize_name(chunk['Crop']),
+            # Season labels are kept verbatim: the trained model was fit on the raw values
+            'season': chunk['season'].astype(str),
+            'Yield': chunk_yields(chunk),
+        }).dropna(subset=['Yield'])
+        rows_used += len(part)
+        part = part.assign(Count=1).groupby(keys)[['Yield', 'Count']].sum()
+        acc = accumulate(acc, part)
+
+    if acc is None or acc.empty:
+        raise ValueError(f"No usable yield rows in {yield_csv}")
+
+    avg = (acc['Yield'] / acc['Count']).rename('Avg_Yield').reset_index()
+
+    crop_reqs = pd.read_csv(crop_reqs_path)
+    crop_reqs['Crop'] = normalize_name(crop_reqs['Crop'])
+    master = avg.merge(crop_reqs, on='Crop', how='inner')
+    if master.empty:
+        raise ValueError(f"No crops in {yield_csv} match {os.path.basename(crop_reqs_path)}")
+    master = master.sort_values(keys, kind='mergesort').reset_index(drop=True)
+    write_atomic(out_path, lambda path: master.to_csv(path, index=False))
+
+    return master, {'rows_in': rows_in, 'rows_used': rows_used, 'groups': len(avg), 'rows_out': len(master)}
+
+def build_district_coords(coords_csv, out_path=COORDS_DATA_PATH, chunksize=DEFAULT_CHUNKSIZE):
+    keys = ['State', 'District']
+    acc = None
+    rows_in = rows_used = 0
+
+    for chunk in stream_csv(coords_csv, COORDS_COLUMNS, chunksize):
+        rows_in += len(chunk)
+        chunk = chunk.dropna(subset=keys)
+        part = pd.DataFrame({
+            'State': chunk['State'].map(normalize_state),
+            'District': normalize_name(chunk['District']),
+            'Latitude': pd.to_numeric(chunk['Latitude'], errors='coerce'),
+            'Longitude': pd.to_numeric(chunk['Longitude'], errors='coerce'),
+        }).dropna()
+        part = part[part['Latitude'].between(*LAT_RANGE) & part['Longitude'].between(*LON_RANGE)]
+        rows_used += len(part)
+        part = part.assign(Count=1).groupby(keys)[['Latitude', 'Longitude', 'Count']].sum()
+        acc = accumulate(acc, part)
+
+    if acc is None or acc.empty:
+        raise ValueError(f"No usable coordinates in {coords_csv} (rows missing or outside India)")
+
+    coords = pd.DataFrame({
+        'Latitude': acc['Latitude'] / acc['Count'],
+        'Longitude': acc['Longitude'] / acc['Count'],
+    }).reset_index()
+    coords = coords.sort_values(keys, kind='mergesort').reset_index(drop=True)
+    write_atomic(out_path, lambda path: coords.to_csv(path, index=False))
+
+    return coords, {'rows_in': rows_in, 'rows_used': rows_used, 'rows_out': len(coords)}
+
+def write_parquet_twin(df, csv_path):
+    """Write a columnar copy next to the CSV. Needs pyarrow (optional dependency)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow not installed, skipping Parquet output.")
+        return None
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    write_atomic(parquet_path, lambda path: df.to_parquet(path, index=False))
+    return parquet_path
+
+def run_stage(name, builder, source, out_path, parquet, **kwargs):
+    start = time.perf_counter()
+    df, stats = builder(source, out_path=out_path, **kwargs)
+    stage = {
+        'stage': name,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'chunksize': kwargs.get('chunksize'),
+        'source': os.path.basename(source),
+        'source_sha256': file_sha256(source),
+        'output': os.path.basename(out_path),
+        'output_sha256': file_sha256(out_path),
+        **stats,
+    }
+    if parquet:
+        parquet_path = write_parquet_twin(df, out_path)
+        if parquet_path:
+            stage['parquet'] = os.path.basename(parquet_path)
+            stage['parquet_sha256'] = file_sha256(parquet_path)
+    stage['seconds'] = round(time.perf_counter() - start, 3)
+    return stage
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        print(f"Could not read {os.path.basename(path)}, starting a new manifest.")
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def update_manifest(manifest_path, stages):
+    # Merge into the existing manifest so stages not rebuilt this run keep their provenance
+    manifest = load_manifest(manifest_path)
+    rebuilt = {stage['stage']: stage for stage in stages}
+    merged = [rebuilt.pop(stage['stage'], stage) for stage in manifest.get('stages', []) if 'stage' in stage]
+    manifest['stages'] = merged + list(rebuilt.values())
+    manifest['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    def dump(path):
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    write_atomic(manifest_path, dump)
+    return manifest
+
+def build_assets(yield_csv=None, coords_csv=None, out_dir=None, chunksize=DEFAULT_CHUNKSIZE, parquet=False):
+    if not yield_csv and not coords_csv:
+        raise ValueError("Nothing to build: pass a yield source, a coordinates source, or both.")
+
+    out_dir = out_dir or os.path.dirname(HISTORICAL_DATA_PATH)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, os.path.basename(MANIFEST_PATH))
+    stages = []
+    manifest = None
+
+    try:
+        if yield_csv:
+            stages.append(run_stage(
+                'district_crop_master', build_district_crop_master, yield_csv,
+                os.path.join(out_dir, os.path.basename(HISTORICAL_DATA_PATH)), parquet,
+                crop_reqs_path=CROP_DATA_PATH, chunksize=chunksize,
+            ))
+            stages[-1]['crop_requirements_sha256'] = file_sha256(CROP_DATA_PATH)
+        if coords_csv:
+            stages.append(run_stage(
+                'district_coords', build_district_coords, coords_csv,
+                os.path.join(out_dir, os.path.basename(COORDS_DATA_PATH)), parquet,
+                chunksize=chunksize,
+            ))
+    finally:
+        # Record whatever did get rebuilt, even if a later stage failed
+        if stages:
+            manifest = update_manifest(manifest_path, stages)
+
+    return manifest, stages
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the optimized CSVs in assets/data from raw source files.")
+    parser.add_argument("--yield-csv", help="Raw district-level yield records (e.g. crop_production.csv)")
+    parser.add_argument("--coords-csv", help="Raw geocoded records with state/district/lat/long (e.g. pincode directory)")
+    parser.add_argument("--out-dir", help="Output directory (default: assets/data)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    parser.add_argument("--parquet", action="store_true", help="Also write Parquet twins (requires pyarrow)")
+    args = parser.parse_args()
+
+    if not args.yield_csv and not args.coords_csv:
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        manifest, stages = build_assets(args.yield_csv, args.coords_csv, args.out_dir, args.chunksize, args.parquet)
+        print("\n--- Asset Build Summary ---")
+        for stage in stages:
+            print(f"{stage['stage']}: {stage['rows_in']:,} rows in -> {stage['rows_out']:,} rows out in {stage['seconds']}s")
+    except Exception as e:
+        print(f"Error during asset build: {e}")
+        sys.exit(1)
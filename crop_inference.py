@@ -4,6 +4,8 @@ import pickle
 import os
 import xgboost as xgb
 
+from normalization import normalize_state, normalize_name
+
 def get_asset_path(sub_path):
     base_path = getattr(os.sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     assets_path = os.path.join(base_path, 'assets', sub_path)
@@ -103,6 +105,107 @@ def predict_crop_recommendations(state_name, district_name=None):
     
     return df_results, state_name, district_name
 
+SIMILARITY_METRICS = ('cosine', 'euclidean')
+
+class DistrictSimilarityIndex:
+    """District x (crop, season) yield matrix for nearest-district queries."""
+
+    def __init__(self, historical):
+        df = historical[['State', 'District', 'Crop', 'season', 'Avg_Yield']].copy()
+        df['State'] = df['State'].map(normalize_state)
+        df['District'] = normalize_name(df['District'])
+        df['Feature'] = normalize_name(df['Crop']) + ' (' + df['season'].str.strip() + ')'
+
+        pivot = df.pivot_table(index=['State', 'District'], columns='Feature', values='Avg_Yield', aggfunc='mean')
+        values = pivot.to_numpy(dtype=float)
+
+        # Crops a district never grew stay at zero, so they add nothing to dot products.
+        # Per-column log scaling stops high-tonnage crops (sugarcane, coconut) dominating.
+        self.grown = ~np.isnan(values)
+        values = np.log1p(np.clip(np.nan_to_num(values), 0, None))
+        scale = values.max(axis=0)
+        scale[scale == 0] = 1.0
+        self.matrix = (values / scale).astype(np.float32)
+
+        norms = np.linalg.norm(self.matrix, axis=1)
+        norms[norms == 0] = 1.0
+        self._unit = self.matrix / norms[:, None]
+        self._sq_norms = (self.matrix ** 2).sum(axis=1)
+        self._grown_f = self.grown.astype(np.float32)
+
+        self.districts = pivot.index.to_frame(index=False)
+        self.features = pivot.columns.tolist()
+        self._lookup = {key: i for i, key in enumerate(pivot.index)}
+
+    def __len__(self):
+        return len(self._lookup)
+
+    def _scores(self, rows, metric):
+        # Higher is always better; euclidean distances are returned negated
+        if metric == 'cosine':
+            return self._unit[rows] @ self._unit.T
+        if metric == 'euclidean':
+            sq = self._sq_norms[rows, None] + self._sq_norms[None, :] - 2.0 * (self.matrix[rows] @ self.matrix.T)
+            return -np.sqrt(np.maximum(sq, 0))
+        raise ValueError(f"Unknown metric '{metric}'. Use one of {SIMILARITY_METRICS}.")
+
+    def _top_k(self, rows, k, metric):
+        rows = np.asarray(rows)
+        scores = self._scores(rows, metric)
+        scores[np.arange(len(rows)), rows] = -np.inf
+        k = max(0, min(k, len(self) - 1))
+        if k == 0:
+            empty = np.empty((len(rows), 0), dtype=int)
+            return empty, scores[:, :0], empty
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        shared = np.take_along_axis(self._grown_f[rows] @ self._grown_f.T, top, axis=1).astype(int)
+        return top, top_scores, shared
+
+    def _frame(self, top, top_scores, shared, metric):
+        matches = self.districts.iloc[top.ravel()].reset_index(drop=True)
+        score_col = 'Similarity' if metric == 'cosine' else 'Distance'
+        matches[score_col] = top_scores.ravel() if metric == 'cosine' else -top_scores.ravel()
+        matches['Shared_Crops'] = shared.ravel()
+        return matches
+
+    def query(self, state_name, district_name, k=5, metric='cosine'):
+        key = (normalize_state(state_name), normalize_name(district_name))
+        if key not in self._lookup:
+            return f"District '{key[1]}' in '{key[0]}' not found."
+        top, top_scores, shared = self._top_k([self._lookup[key]], k, metric)
+        matches = self._frame(top, top_scores, shared, metric)
+        matches.insert(0, 'Rank', np.arange(1, len(matches) + 1))
+        return matches
+
+    def query_all(self, k=5, metric='cosine'):
+        top, top_scores, shared = self._top_k(np.arange(len(self)), k, metric)
+        matches = self._frame(top, top_scores, shared, metric)
+        matches.columns = ['Match_State', 'Match_District'] + matches.columns[2:].tolist()
+        source = self.districts.loc[self.districts.index.repeat(top.shape[1])].reset_index(drop=True)
+        source['Rank'] = np.tile(np.arange(1, top.shape[1] + 1), len(self))
+        return pd.concat([source, matches], axis=1)
+
+_SIMILARITY_INDEX = None
+
+def load_similarity_index():
+    global _SIMILARITY_INDEX
+    if _SIMILARITY_INDEX is None:
+        if not os.path.exists(HISTORICAL_DATA_PATH):
+            raise FileNotFoundError(f"Missing: {HISTORICAL_DATA_PATH}")
+        _SIMILARITY_INDEX = DistrictSimilarityIndex(pd.read_csv(HISTORICAL_DATA_PATH))
+    return _SIMILARITY_INDEX
+
+def find_similar_districts(state_name, district_name, k=5, metric='cosine'):
+    index = load_similarity_index()
+    state_name = normalize_state(state_name)
+    district_name = normalize_name(district_name)
+    return index.query(state_name, district_name, k=k, metric=metric), state_name, district_name
+
 if __name__ == "__main__":
     import sys
     state = "Andhra Pradesh"
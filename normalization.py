@@ -0,0 +1,19 @@
+# Shared name cleanup for the app, inference and the asset build pipeline.
+# Keep this module dependency-light: it ships with the packaged app.
+
+def normalize_state(name):
+    if not isinstance(name, str): return name
+    mapping = {
+        "Andaman And Nicobar Islands": "Andaman And Nicobar",
+        "Dadra And Nagar Haveli": "Dadra & Nagar Haveli",
+        "Daman And Diu": "Daman & Diu",
+        "Jammu And Kashmir": "Jammu & Kashmir",
+        "Delhi": "Nct Of Delhi"
+    }
+    name = name.title().strip()
+    return mapping.get(name, name)
+
+def normalize_name(name):
+    # Accepts a single name or a pandas Series of names
+    if isinstance(name, str): return name.title().strip()
+    return name.astype(str).str.title().str.strip()